@@ -106,6 +106,7 @@ let isLiveMode = false;
 let currentFacingMode = 'environment';
 let inspectionHistory = [];
 let capturedImages = [];  // Store captured image data for review
+let captureLimitWarned = false;  // Only warn once per session when live captures are full
 
 // ═══════════════════════════════════════════════════════════
 // SPLASH SCREEN INITIALIZATION
@@ -351,11 +352,17 @@ async function performLiveDetection() {
       document.getElementById('detectedCount').textContent = data.unique_defects || 0;
       document.getElementById('captureCount').textContent = data.total_captures || 0;
       
-      if (data.new_capture) {
+      if (data.new_capture || data.updated_captures > 0) {
         const badge = document.getElementById('capturedBadge');
+        badge.textContent = data.new_capture ? '📸 Captured!' : '📸 Better shot saved!';
         badge.classList.remove('hidden');
         setTimeout(() => badge.classList.add('hidden'), 1000);
       }
+      
+      if (data.dropped_defects > 0 && !captureLimitWarned) {
+        captureLimitWarned = true;
+        showStatus('Capture limit reached - new defects are no longer being saved. Finish or reset the inspection to continue.', 'error');
+      }
     } catch (error) {
       console.error('Detection error:', error);
     } finally {
@@ -678,6 +685,7 @@ function showStatus(message, type, containerId = 'statusMessage') {
 function resetInspection() {
   uploadedFiles = [];
   capturedImages = [];
+  captureLimitWarned = false;
   isLiveMode = false;
   document.getElementById('previewContainer').innerHTML = '';
   document.getElementById('fileInput').value = '';
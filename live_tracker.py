@@ -0,0 +1,138 @@
+"""
+Cross-frame tracking for live detection captures.
+
+Detections are matched to recently seen tracks of the same class so each
+distinct defect keeps a single, best capture instead of one per class name.
+"""
+
+TRACK_IOU_THRESHOLD = 0.3        # Minimum box overlap to treat two detections as the same defect
+TRACK_CENTROID_RATIO = 0.5       # Fallback: centre distance as a fraction of the tracked box size
+TRACK_MAX_AGE = 2                # Frames a track stays matchable after it was last seen (~4 s at 2 s/frame)
+MAX_LIVE_CAPTURES = 20           # Upper bound on tracked defects (and capture JPEGs) per session
+SHARPNESS_MARGIN = 0.15          # Relative sharpness change that counts as sharper/blurrier
+CONFIDENCE_MARGIN = 5.0          # Max confidence points below a track's best that a sharper frame may have
+
+
+def box_iou(box_a, box_b):
+    """IoU of two (x_center, y_center, width, height) boxes"""
+    ax1, ay1 = box_a[0] - box_a[2] / 2, box_a[1] - box_a[3] / 2
+    ax2, ay2 = box_a[0] + box_a[2] / 2, box_a[1] + box_a[3] / 2
+    bx1, by1 = box_b[0] - box_b[2] / 2, box_b[1] - box_b[3] / 2
+    bx2, by2 = box_b[0] + box_b[2] / 2, box_b[1] + box_b[3] / 2
+
+    inter_w = max(0.0, min(ax2, bx2) - max(ax1, bx1))
+    inter_h = max(0.0, min(ay2, by2) - max(ay1, by1))
+    intersection = inter_w * inter_h
+    union = box_a[2] * box_a[3] + box_b[2] * box_b[3] - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def new_track(class_name: str, display_name: str, box, frame_index: int, confidence: float, sharpness: float):
+    """Create a track for a defect that didn't match any active track"""
+    return {
+        "class": class_name,
+        "display_name": display_name,
+        "box": box,
+        "last_seen": frame_index,
+        "best_confidence": confidence,     # Highest confidence ever seen - what the report shows
+        "capture_confidence": confidence,  # Confidence of the frame currently kept
+        "sharpness": sharpness,            # Sharpness of the crop currently kept
+        "capture_path": None
+    }
+
+
+def is_active(track, frame_index: int):
+    """Tracks only match while recently seen - image coordinates mean nothing once the camera moves"""
+    return frame_index - track["last_seen"] <= TRACK_MAX_AGE
+
+
+def match_score(track, box):
+    """Overlap score between a track and a detection, or None if they don't match"""
+    score = box_iou(track["box"], box)
+    if score >= TRACK_IOU_THRESHOLD:
+        return score
+
+    # Fall back to centroid distance for small or fast-moving boxes
+    distance = ((track["box"][0] - box[0]) ** 2 + (track["box"][1] - box[1]) ** 2) ** 0.5
+    limit = TRACK_CENTROID_RATIO * max(track["box"][2], track["box"][3])
+    if limit <= 0 or distance > limit:
+        return None
+    return TRACK_IOU_THRESHOLD * (1 - distance / limit)
+
+
+def assign_tracks(tracks, detections, frame_index: int):
+    """
+    Match detections (class_name, box) to active tracks of the same class.
+    Every pair is scored first and assigned best-first, so a weak centroid
+    match can't take a track that another detection overlaps strongly.
+    Returns the matched track (or None) for each detection.
+    """
+    active_tracks = [track for track in tracks if is_active(track, frame_index)]
+
+    pairs = []
+    for det_index, (class_name, box) in enumerate(detections):
+        for track in active_tracks:
+            if track["class"] != class_name:
+                continue
+            score = match_score(track, box)
+            if score is not None:
+                pairs.append((score, det_index, track))
+
+    pairs.sort(key=lambda pair: pair[0], reverse=True)
+
+    assigned = [None] * len(detections)
+    claimed = set()
+    for _, det_index, track in pairs:
+        if assigned[det_index] is not None or id(track) in claimed:
+            continue
+        assigned[det_index] = track
+        claimed.add(id(track))
+    return assigned
+
+
+def is_better_capture(track, confidence: float, sharpness: float):
+    """
+    Decide whether a new detection beats the frame kept for a track.
+    Confidence decides; sharpness (relative to the kept crop) only breaks
+    near-ties, and never lets the kept frame drift more than
+    CONFIDENCE_MARGIN below the best confidence the track has seen.
+    """
+    if confidence < track["best_confidence"] - CONFIDENCE_MARGIN:
+        return False
+
+    previous = track["sharpness"]
+    if previous > 0:
+        ratio = sharpness / previous
+    else:
+        ratio = 1.0 if sharpness <= 0 else float("inf")
+
+    if ratio < 1 - SHARPNESS_MARGIN:
+        # Blurrier - only worth it if the confidence gain outweighs the blur
+        return confidence * ratio > track["capture_confidence"]
+    if ratio > 1 + SHARPNESS_MARGIN:
+        return confidence >= track["capture_confidence"] - CONFIDENCE_MARGIN
+    return confidence > track["capture_confidence"]
+
+
+def assign_capture(tracks, updated_tracks, new_path: str):
+    """
+    Point every updated track at one capture of the current frame.
+    Overwrites an existing file when all of its tracks are being updated,
+    otherwise uses new_path. Returns (path, released_paths) where
+    released_paths are files no track references any more.
+    """
+    updated_ids = {id(track) for track in updated_tracks}
+    previous_paths = {track["capture_path"] for track in updated_tracks if track["capture_path"]}
+
+    path = new_path
+    for candidate in previous_paths:
+        if all(id(track) in updated_ids for track in tracks if track["capture_path"] == candidate):
+            path = candidate
+            break
+
+    for track in updated_tracks:
+        track["capture_path"] = path
+
+    still_used = {track["capture_path"] for track in tracks}
+    released = [p for p in previous_paths if p not in still_used]
+    return path, released
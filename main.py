@@ -9,6 +9,7 @@ import requests
 import base64
 from typing import List, Optional
 from report import generate_report
+from live_tracker import MAX_LIVE_CAPTURES, new_track, assign_tracks, is_better_capture, assign_capture
 
 app = FastAPI(title="AutoSpect - AI Vehicle Inspection API")
 
@@ -44,10 +45,36 @@ CLASS_MAPPING = {
     "windshield": "Windshield"
 }
 
+SHARPNESS_CROP_SIZE = 128  # Crops are resized to this square before measuring sharpness
+
 # Global state for live detection captures
 captured_frames = []
 captured_defect_types = set()
-captured_all_defects = []  # NEW: Store all defects with confidence for report generation
+live_tracks = []  # One entry per tracked defect, holding its best capture
+live_frame_index = 0
+live_capture_count = 0  # Used to name new capture files
+
+
+def crop_sharpness(gray_frame, box):
+    """
+    Variance of the Laplacian inside a box - higher means a sharper crop.
+    The crop is resized to a fixed size first so values are comparable
+    between frames where the same defect appears larger or smaller, and
+    lightly blurred so sensor noise doesn't read as detail.
+    """
+    frame_h, frame_w = gray_frame.shape[:2]
+    x, y, w, h = box
+    x1, y1 = max(0, int(x - w / 2)), max(0, int(y - h / 2))
+    x2, y2 = min(frame_w, int(x + w / 2)), min(frame_h, int(y + h / 2))
+    if x2 <= x1 or y2 <= y1:
+        return 0.0
+    crop = cv2.resize(
+        gray_frame[y1:y2, x1:x2],
+        (SHARPNESS_CROP_SIZE, SHARPNESS_CROP_SIZE),
+        interpolation=cv2.INTER_AREA
+    )
+    crop = cv2.GaussianBlur(crop, (3, 3), 0)
+    return float(cv2.Laplacian(crop, cv2.CV_64F).var())
 
 
 def detect_damage(image_path: str):
@@ -76,9 +103,10 @@ def detect_damage(image_path: str):
 async def detect_live(file: UploadFile = File(...)):
     """
     Live detection endpoint - analyzes a single frame from iVCam,
-    returns detected defects, and auto-captures if new defect found.
+    returns detected defects, and tracks each defect across frames so its
+    capture is created once and replaced in place by better frames.
     """
-    global captured_frames, captured_defect_types, captured_all_defects
+    global captured_frames, captured_defect_types, live_tracks, live_frame_index, live_capture_count
     
     if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
@@ -92,11 +120,20 @@ async def detect_live(file: UploadFile = File(...)):
         predictions = result.get("predictions", [])
         
         frame = cv2.imread(temp_path)
+        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        live_frame_index += 1
         defects = []
+        tracks_to_capture = []
         new_defect_found = False
+        dropped_defects = 0
         
-        for pred in predictions:
-            class_name = pred["class"].lower().strip()
+        detections = [
+            (pred["class"].lower().strip(), (pred["x"], pred["y"], pred["width"], pred["height"]))
+            for pred in predictions
+        ]
+        assigned = assign_tracks(live_tracks, detections, live_frame_index)
+        
+        for pred, (class_name, box), track in zip(predictions, detections, assigned):
             display_name = CLASS_MAPPING.get(class_name, class_name.capitalize())
             confidence = round(pred["confidence"] * 100, 1)
             
@@ -105,9 +142,27 @@ async def detect_live(file: UploadFile = File(...)):
                 "confidence": confidence
             })
             
-            if class_name not in captured_defect_types:
+            sharpness = crop_sharpness(gray_frame, box)
+            
+            if track is None:
+                # Tracks are never evicted, so every confirmed defect stays in the report
+                if len(live_tracks) >= MAX_LIVE_CAPTURES:
+                    dropped_defects += 1
+                    continue
+                
+                track = new_track(class_name, display_name, box, live_frame_index, confidence, sharpness)
+                live_tracks.append(track)
                 captured_defect_types.add(class_name)
+                tracks_to_capture.append(track)
                 new_defect_found = True
+            else:
+                track["box"] = box
+                track["last_seen"] = live_frame_index
+                if is_better_capture(track, confidence, sharpness):
+                    track["capture_confidence"] = confidence
+                    track["sharpness"] = sharpness
+                    tracks_to_capture.append(track)
+                track["best_confidence"] = max(track["best_confidence"], confidence)
         
         annotated_frame = frame.copy()
         for pred in predictions:
@@ -151,19 +206,20 @@ async def detect_live(file: UploadFile = File(...)):
                 2
             )
         
-        # NEW: If new defect found, capture this frame AND store defects
-        if new_defect_found and len(predictions) > 0:
-            capture_filename = f"capture_{len(captured_frames)}.jpg"
-            capture_path = os.path.join(STATIC_DIR, capture_filename)
+        # Write this frame once for all new or improved tracks, overwriting
+        # their old capture in place when no other track still uses it
+        if tracks_to_capture:
+            next_path = os.path.join(STATIC_DIR, f"capture_{live_capture_count}.jpg")
+            capture_path, released = assign_capture(live_tracks, tracks_to_capture, next_path)
             cv2.imwrite(capture_path, annotated_frame)
-            captured_frames.append(capture_path)
             
-            # NEW: Store the defects for this frame
-            for pred in predictions:
-                class_name = pred["class"].lower().strip()
-                display_name = CLASS_MAPPING.get(class_name, class_name.capitalize())
-                confidence = round(pred["confidence"] * 100, 1)
-                captured_all_defects.append((display_name, confidence))
+            if capture_path == next_path:
+                live_capture_count += 1
+                captured_frames.append(capture_path)
+            for old_path in released:
+                captured_frames.remove(old_path)
+                if os.path.exists(old_path):
+                    os.remove(old_path)
         
         _, buffer = cv2.imencode('.jpg', annotated_frame)
         frame_base64 = base64.b64encode(buffer).decode('utf-8')
@@ -172,7 +228,9 @@ async def detect_live(file: UploadFile = File(...)):
             "success": True,
             "defects": defects,
             "count": len(defects),
-            "new_capture": new_defect_found and len(predictions) > 0,
+            "new_capture": new_defect_found,
+            "updated_captures": len(tracks_to_capture),
+            "dropped_defects": dropped_defects,
             "total_captures": len(captured_frames),
             "unique_defects": len(captured_defect_types),
             "annotated_frame": frame_base64
@@ -196,14 +254,14 @@ async def finalize_live_detection(
     """
     Generate report from captured frames during live detection.
     """
-    global captured_frames, captured_defect_types, captured_all_defects
+    global captured_frames, captured_defect_types, live_tracks, live_frame_index, live_capture_count
     
     if len(captured_frames) == 0:
         raise HTTPException(status_code=400, detail="No frames captured during live detection")
     
-    # NEW: Use the defects that were already collected during live detection
+    # Use the best detection of each tracked defect collected during live detection
     # This prevents re-running inference on already processed frames
-    all_defects = captured_all_defects.copy()
+    all_defects = [(track["display_name"], track["best_confidence"]) for track in live_tracks]
     
     vehicle_info = {
         "vin": vin or "Not Provided",
@@ -224,7 +282,9 @@ async def finalize_live_detection(
     # Reset global state
     captured_frames = []
     captured_defect_types = set()
-    captured_all_defects = []  # NEW: Reset stored defects
+    live_tracks = []
+    live_frame_index = 0
+    live_capture_count = 0
     
     return {
         "message": "Live detection report generated",
@@ -239,7 +299,7 @@ async def finalize_live_detection(
 @app.post("/reset-live-detection")
 async def reset_live_detection():
     """Reset live detection state."""
-    global captured_frames, captured_defect_types, captured_all_defects
+    global captured_frames, captured_defect_types, live_tracks, live_frame_index, live_capture_count
     
     for frame_path in captured_frames:
         if os.path.exists(frame_path):
@@ -250,7 +310,9 @@ async def reset_live_detection():
     
     captured_frames = []
     captured_defect_types = set()
-    captured_all_defects = []  # NEW: Reset stored defects
+    live_tracks = []
+    live_frame_index = 0
+    live_capture_count = 0
     
     return {"message": "Live detection reset"}
 
@@ -0,0 +1,155 @@
+import pytest
+
+from live_tracker import (
+    TRACK_MAX_AGE,
+    CONFIDENCE_MARGIN,
+    box_iou,
+    new_track,
+    assign_tracks,
+    is_better_capture,
+    assign_capture,
+)
+
+
+def make_track(box, last_seen=1, confidence=50.0, sharpness=10.0, class_name="door", capture_path=None):
+    track = new_track(class_name, class_name.capitalize(), box, last_seen, confidence, sharpness)
+    track["capture_path"] = capture_path
+    return track
+
+
+# --- box_iou ---------------------------------------------------------------
+
+def test_box_iou_identical_boxes():
+    assert box_iou((100, 100, 60, 50), (100, 100, 60, 50)) == pytest.approx(1.0)
+
+
+def test_box_iou_disjoint_boxes():
+    assert box_iou((0, 0, 10, 10), (100, 100, 10, 10)) == 0.0
+
+
+def test_box_iou_half_overlap():
+    # Two 10x10 boxes offset by 5 px share a 5x10 strip: 50 / 150
+    assert box_iou((0, 0, 10, 10), (5, 0, 10, 10)) == pytest.approx(1 / 3)
+
+
+# --- assign_tracks ---------------------------------------------------------
+
+def test_matches_same_class_overlapping_box():
+    track = make_track((100, 100, 60, 50))
+    assert assign_tracks([track], [("door", (102, 101, 60, 50))], 2) == [track]
+
+
+def test_does_not_match_other_class():
+    track = make_track((100, 100, 60, 50))
+    assert assign_tracks([track], [("bumper", (100, 100, 60, 50))], 2) == [None]
+
+
+def test_strong_overlap_beats_earlier_weak_centroid_match():
+    track = make_track((100, 100, 60, 50))
+    detections = [
+        ("door", (120, 110, 20, 20)),   # weak centroid-only match, listed first
+        ("door", (101, 100, 60, 50)),   # near-perfect overlap
+    ]
+    assert assign_tracks([track], detections, 2) == [None, track]
+
+
+def test_each_track_matches_at_most_one_detection():
+    left = make_track((100, 100, 60, 50))
+    right = make_track((300, 100, 60, 50))
+    detections = [("door", (302, 100, 60, 50)), ("door", (98, 100, 60, 50))]
+    assert assign_tracks([left, right], detections, 2) == [right, left]
+
+
+def test_track_still_matches_within_max_age():
+    track = make_track((100, 100, 60, 50), last_seen=1)
+    assert assign_tracks([track], [("door", (100, 100, 60, 50))], 1 + TRACK_MAX_AGE) == [track]
+
+
+def test_expired_track_is_never_matched():
+    track = make_track((100, 100, 60, 50), last_seen=1)
+    assert assign_tracks([track], [("door", (100, 100, 60, 50))], 2 + TRACK_MAX_AGE) == [None]
+    assert assign_tracks([track], [("door", (100, 100, 60, 50))], 150) == [None]
+
+
+# --- is_better_capture -----------------------------------------------------
+
+def test_higher_confidence_at_similar_sharpness_wins():
+    track = make_track((0, 0, 10, 10), confidence=50.0, sharpness=10.0)
+    assert is_better_capture(track, 60.0, 10.5)
+
+
+def test_equal_confidence_and_sharpness_does_not_replace():
+    track = make_track((0, 0, 10, 10), confidence=50.0, sharpness=10.0)
+    assert not is_better_capture(track, 50.0, 10.0)
+
+
+def test_sharper_frame_wins_with_small_confidence_loss():
+    track = make_track((0, 0, 10, 10), confidence=50.0, sharpness=10.0)
+    assert is_better_capture(track, 48.0, 13.0)
+
+
+def test_blurrier_frame_needs_confidence_gain_to_outweigh_blur():
+    track = make_track((0, 0, 10, 10), confidence=50.0, sharpness=10.0)
+    assert not is_better_capture(track, 55.0, 5.0)
+    assert is_better_capture(track, 90.0, 8.0)
+
+
+def test_zero_sharpness_tracks_fall_back_to_confidence():
+    track = make_track((0, 0, 10, 10), confidence=50.0, sharpness=0.0)
+    assert is_better_capture(track, 51.0, 0.0)
+    assert not is_better_capture(track, 49.0, 0.0)
+    assert is_better_capture(track, 49.0, 0.5)
+
+
+def test_sharper_frames_cannot_drift_confidence_below_best():
+    track = make_track((0, 0, 10, 10), confidence=80.0, sharpness=10.0)
+    confidence, sharpness = 80.0, 10.0
+    for _ in range(8):
+        confidence -= CONFIDENCE_MARGIN
+        sharpness *= 1.5
+        if is_better_capture(track, confidence, sharpness):
+            track["capture_confidence"] = confidence
+            track["sharpness"] = sharpness
+        track["best_confidence"] = max(track["best_confidence"], confidence)
+
+    assert track["capture_confidence"] >= track["best_confidence"] - CONFIDENCE_MARGIN
+
+
+# --- assign_capture --------------------------------------------------------
+
+def test_new_tracks_in_one_frame_share_a_single_capture():
+    first = make_track((0, 0, 10, 10))
+    second = make_track((50, 50, 10, 10))
+    path, released = assign_capture([first, second], [first, second], "capture_0.jpg")
+
+    assert path == "capture_0.jpg"
+    assert first["capture_path"] == second["capture_path"] == "capture_0.jpg"
+    assert released == []
+
+
+def test_improved_track_overwrites_its_own_capture_in_place():
+    track = make_track((0, 0, 10, 10), capture_path="capture_0.jpg")
+    path, released = assign_capture([track], [track], "capture_1.jpg")
+
+    assert path == "capture_0.jpg"
+    assert released == []
+
+
+def test_shared_capture_is_kept_for_tracks_not_updated():
+    updated = make_track((0, 0, 10, 10), capture_path="capture_0.jpg")
+    other = make_track((50, 50, 10, 10), capture_path="capture_0.jpg")
+    path, released = assign_capture([updated, other], [updated], "capture_1.jpg")
+
+    assert path == "capture_1.jpg"
+    assert other["capture_path"] == "capture_0.jpg"
+    assert released == []
+
+
+def test_captures_no_longer_referenced_are_released():
+    first = make_track((0, 0, 10, 10), capture_path="capture_0.jpg")
+    second = make_track((50, 50, 10, 10), capture_path="capture_1.jpg")
+    path, released = assign_capture([first, second], [first, second], "capture_2.jpg")
+
+    assert path in ("capture_0.jpg", "capture_1.jpg")
+    assert first["capture_path"] == second["capture_path"] == path
+    assert released == [p for p in ("capture_0.jpg", "capture_1.jpg") if p != path]